@@ -1,358 +1,449 @@
-import requests
+import asyncio
+import os
+import json
+import pickle
+import hashlib
 import random
-import PyPDF2
+import aiohttp
+import aiofiles
+import pypdfium2 as pdfium
 import re
-import pandas as pd
-import time
+import pyarrow as pa
+import pyarrow.parquet as pq
 import logging
-from fake_useragent import UserAgent
-from urllib3.util.retry import Retry
-from requests.adapters import HTTPAdapter
-from requests.exceptions import Timeout, ConnectionError
+from collections import defaultdict
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
 
 # Set up logging for debugging
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 
-# Function to download PDF with retries, dynamic headers, and better error handling
-def download_pdf(url, filename):
-    session = requests.Session()
-    retry = Retry(total=5, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])
-    adapter = HTTPAdapter(max_retries=retry)
-    session.mount("http://", adapter)
-    session.mount("https://", adapter)
+# Download concurrency and retry settings
+MAX_CONCURRENT_DOWNLOADS = 32
+MAX_REQUESTS_PER_HOST = 4
+RETRY_TOTAL = 5
+RETRY_BACKOFF_FACTOR = 1
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Connection failures, timeouts and truncated bodies are retried like RETRY_STATUSES
+TRANSIENT_ERRORS = (asyncio.TimeoutError, aiohttp.ClientConnectionError, aiohttp.ClientPayloadError)
+
+# File listing the URLs of the PDFs, one per line
+URLS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "urls_2024-11-27.txt")
+
+# Download chunk size and the write buffer used when saving PDFs
+CHUNK_SIZE = 65536
+WRITE_BUFFER_SIZE = 1 << 20
+
+# Output file; rows are buffered into row groups of this many PDFs
+OUTPUT_FILE = "us_code_citations.parquet"
+ROW_GROUP_SIZE = 64
+OUTPUT_SCHEMA = pa.schema([("filename", pa.string()), ("citations", pa.list_(pa.string()))])
+
+# Cache of citations keyed on the SHA-1 of each PDF; bump the version whenever
+# extraction or matching changes so stale results are discarded. The cache is
+# also tied to the scanning engine (see CITATION_ENGINE)
+CITATION_CACHE_FILE = "us_code_citations_cache.pkl"
+CITATION_CACHE_VERSION = 4
+
+# Browser User-Agent strings to rotate through
+_UAS = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/130.0.0.0 Safari/537.36 Edg/130.0.0.0",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:133.0) Gecko/20100101 Firefox/133.0",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/18.1 Safari/605.1.15",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 14.7; rv:133.0) Gecko/20100101 Firefox/133.0",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:133.0) Gecko/20100101 Firefox/133.0",
+)
 
+# Function to turn a Retry-After header (seconds or HTTP date) into a delay in seconds
+def retry_after_seconds(value):
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+# Function to download PDF with retries, dynamic headers, and better error handling;
+# next_allowed maps each host to the loop time before which it asked us not to call
+async def download_pdf(session, url, filename, next_allowed):
     # Use a random User-Agent to simulate human browsing
-    ua = UserAgent()
-    headers = {
-        'User-Agent': ua.random,
-        'Referer': 'https://www.fsis.usda.gov/'
-    }
-    session.headers.update(headers)
+    headers = {'User-Agent': random.choice(_UAS)}
+
+    # Reuse a previous download; revalidate it when the server gave us validators.
+    # Local names depend on the order of the URL list, so only a file whose
+    # sidecar names this URL counts as cached
+    cached = os.path.exists(filename) and os.path.getsize(filename) > 0
+    if cached:
+        meta = load_meta(filename)
+        cached = meta.get('url') == url
+    if cached:
+        if not meta.get('etag') and not meta.get('last_modified'):
+            logging.info(f"Using cached download: {filename}")
+            return True
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+
+    loop = asyncio.get_running_loop()
+    host = urlparse(url).netloc
 
     try:
         logging.info(f"Attempting to download: {url}")
-        response = session.get(url, timeout=120)  # Increased timeout to 120 seconds
-        response.raise_for_status()  # Raise an error for bad status codes
-        
-        with open(filename, 'wb') as f:
-            f.write(response.content)
+        for attempt in range(RETRY_TOTAL + 1):
+            # Only pause when this host has pushed back
+            delay = next_allowed[host] - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            try:
+                async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=120)) as response:
+                    if response.status == 304 and cached:
+                        logging.info(f"Not modified, using cached download: {filename}")
+                        return True
+                    if response.status in RETRY_STATUSES and attempt < RETRY_TOTAL:
+                        logging.warning(f"HTTP {response.status} for {url}, retrying")
+                        retry_after = retry_after_seconds(response.headers.get('Retry-After'))
+                        if retry_after is not None:
+                            # Hold every request to this host until the server is ready again
+                            next_allowed[host] = max(next_allowed[host], loop.time() + retry_after)
+                        else:
+                            await asyncio.sleep(RETRY_BACKOFF_FACTOR * (2 ** attempt))
+                        continue
+                    response.raise_for_status()  # Raise an error for bad status codes
+
+                    # Stream the body to disk instead of buffering the whole PDF in memory;
+                    # write to a .part file so an interrupted transfer never leaves a truncated PDF
+                    part_filename = filename + '.part'
+                    async with aiofiles.open(part_filename, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+                        # Tell the kernel the file is written and read back front to back
+                        if hasattr(os, 'posix_fadvise'):
+                            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                        async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                            await f.write(chunk)
+                    # Servers sometimes answer 200 with an HTML error or bot-check page;
+                    # never put one in place, so the URL is fetched again next run
+                    if not has_pdf_header(part_filename):
+                        logging.warning(f"Not a PDF, discarding download: {url}")
+                        os.remove(part_filename)
+                        return False
+                    os.replace(part_filename, filename)
+                    save_meta(filename, url, response.headers)
+                    break
+            except TRANSIENT_ERRORS as e:
+                if attempt == RETRY_TOTAL:
+                    raise
+                logging.warning(f"Error downloading {url}: {e}, retrying")
+                await asyncio.sleep(RETRY_BACKOFF_FACTOR * (2 ** attempt))
         logging.info(f"Successfully downloaded: {url}")
-    except (Timeout, ConnectionError) as e:
+    except TRANSIENT_ERRORS as e:
         logging.error(f"Error downloading {url}: {e}")
-        time.sleep(10)  # Wait for 10 seconds before retrying
         return False
     except Exception as e:
         logging.error(f"Unexpected error: {e}")
         return False
     return True
 
+# Function to check for a PDF header, which must appear in the first 1024 bytes
+def has_pdf_header(filename):
+    with open(filename, 'rb') as f:
+        return b'%PDF-' in f.read(1024)
+
+# Functions to read and write the source URL / ETag / Last-Modified sidecar of a downloaded PDF
+def load_meta(filename):
+    try:
+        with open(filename + '.meta', 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_meta(filename, url, headers):
+    meta = {'url': url, 'etag': headers.get('ETag'), 'last_modified': headers.get('Last-Modified')}
+    with open(filename + '.meta', 'w') as f:
+        json.dump(meta, f)
+
+# Function to extract text and find citations in one PDF; runs in a worker process
+def process_one_pdf(filename):
+    text = extract_text_from_pdf(filename)
+    return find_us_code_citations(text)
+
+# Function to get the citations of a downloaded PDF from the cache or a worker process;
+# in_flight shares one parse between identical PDFs served under different URLs
+async def citations_for(pool, cache, in_flight, filename):
+    digest = await asyncio.to_thread(file_sha1, filename)
+    citations = cache.get(digest)
+    if citations is not None:
+        logging.info(f"Using cached citations for {filename}")
+        return citations
+
+    if digest not in in_flight:
+        loop = asyncio.get_running_loop()
+        in_flight[digest] = loop.run_in_executor(pool, process_one_pdf, filename)
+    else:
+        logging.info(f"Same content as another PDF, reusing its citations for {filename}")
+    citations = await in_flight[digest]
+    cache[digest] = citations
+    return citations
+
+# Function to download all PDFs concurrently over a single shared session, handing
+# each finished file to the process pool so parsing overlaps the remaining downloads;
+# on_result is called with (filename, citations) as soon as each PDF is done
+async def download_and_process_all(urls, filenames, pool, cache, on_result):
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_DOWNLOADS)
+    host_semaphores = defaultdict(lambda: asyncio.Semaphore(MAX_REQUESTS_PER_HOST))
+    next_allowed = defaultdict(float)
+    in_flight = {}
+    connector = aiohttp.TCPConnector(limit=MAX_CONCURRENT_DOWNLOADS, limit_per_host=MAX_REQUESTS_PER_HOST, ttl_dns_cache=300)
+
+    headers = {'Referer': 'https://www.fsis.usda.gov/'}
+
+    async with aiohttp.ClientSession(connector=connector, headers=headers) as session:
+        async def bounded_download(url, filename):
+            # Take the host slot first so a busy host never ties up global slots
+            async with host_semaphores[urlparse(url).netloc], semaphore:
+                downloaded = await download_pdf(session, url, filename, next_allowed)
+
+            # Parse outside the semaphore so the slot goes to the next download
+            if downloaded:
+                on_result(filename, await citations_for(pool, cache, in_flight, filename))
+
+        await asyncio.gather(*[bounded_download(url, filename) for url, filename in zip(urls, filenames)])
+
+# Functions to load and save the citation cache
+def load_citation_cache():
+    try:
+        with open(CITATION_CACHE_FILE, 'rb') as f:
+            cache = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return {}
+    if cache.get('version') != CITATION_CACHE_VERSION or cache.get('engine') != CITATION_ENGINE:
+        return {}
+    return cache['citations']
+
+def save_citation_cache(citations):
+    with open(CITATION_CACHE_FILE, 'wb') as f:
+        pickle.dump({'version': CITATION_CACHE_VERSION, 'engine': CITATION_ENGINE, 'citations': citations}, f)
+
+# Function to hash a downloaded PDF for the citation cache
+def file_sha1(filename):
+    with open(filename, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+# Function to read the URL list, skipping blank lines and # comments and
+# dropping repeated URLs while keeping their first position
+def load_urls(path):
+    with open(path, 'r') as f:
+        lines = [line.strip() for line in f]
+    return list(dict.fromkeys(line for line in lines if line and not line.startswith('#')))
+
+# Function to pick a local filename for a URL; downloads run concurrently, so
+# URLs sharing a basename get their parent directory prefixed to avoid clobbering
+def local_filename(url, taken):
+    filename = url.split("/")[-1]
+    if filename in taken:
+        filename = f"{url.split('/')[-2]}_{filename}"
+    taken.add(filename)
+    return filename
+
 # Function to extract text from PDF
 def extract_text_from_pdf(pdf_path):
     text = ""
     try:
-        with open(pdf_path, 'rb') as f:
-            reader = PyPDF2.PdfReader(f)
-            for page_num in range(len(reader.pages)):
-                page = reader.pages[page_num]
-                text += page.extract_text()
+        pdf = pdfium.PdfDocument(pdf_path)
+        try:
+            parts = []
+            for page in pdf:
+                textpage = page.get_textpage()
+                parts.append(textpage.get_text_range() or "")
+                # Free PDFium's page buffers now rather than when the document closes
+                textpage.close()
+                page.close()
+            text = "".join(parts)
+        finally:
+            pdf.close()
         logging.info(f"Text extracted from {pdf_path}")
     except Exception as e:
         logging.error(f"Error extracting text from {pdf_path}: {e}")
     return text
 
+# Pattern for U.S. Code citations, compiled once at module load. "\d\w+" matches
+# exactly what "\d+\w+" did without trying every split of a long digit run
+US_CODE_PREFIX = (
+    r'\b(?:\d{1,2}\sU\.S\.C\.|\d{1,2}\sUSC|\d{1,2}\sU\.S\.\sCode|\d{1,2}\sU\.S\.\sC\.|\d{1,2}\sUS\sCode|chapter\s\d+\sof\stitle\s\d+,\sUnited\sStates\sCode|\d\w+\sof\stitle\s\d+,\sUnited\sStates\sCode)\s?'
+)
+US_CODE_PATTERN = US_CODE_PREFIX + r'[\d\w\-–]*\b'
+# For the backtracking re engine (atomic groups need Python 3.11+),
+# the suffix stops at the run's last word character in one pass instead of
+# retrying every shorter length until \b holds; the match set is unchanged
+_US_CODE_RE = re.compile(US_CODE_PREFIX + r'(?>(?:[\d\w\-–]*\w)?)\b', re.IGNORECASE)
+
+# Prefer a linear-time DFA scanner (Hyperscan, then RE2) over the backtracking re engine
+_US_CODE_DB = None
+_US_CODE_RE2 = None
+if hyperscan is not None:
+    try:
+        _US_CODE_DB = hyperscan.Database()
+        _US_CODE_DB.compile(
+            expressions=[US_CODE_PATTERN.encode('utf-8')],
+            ids=[1],
+            # No HS_FLAG_UCP: Hyperscan rejects \b in UCP mode
+            flags=[hyperscan.HS_FLAG_SOM_LEFTMOST | hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_UTF8],
+        )
+    except Exception as e:
+        logging.warning(f"Hyperscan could not compile the citation pattern, falling back: {e}")
+        _US_CODE_DB = None
+if _US_CODE_DB is None and re2 is not None:
+    _US_CODE_RE2 = re2.compile('(?i)' + US_CODE_PATTERN)
+CITATION_ENGINE = 'hyperscan' if _US_CODE_DB is not None else 're2' if _US_CODE_RE2 is not None else 're'
+
+# Lowercase literals that every pattern alternative contains; only text around
+# them is handed to the full citation pattern
+CITATION_KEYWORDS = ("u.s.", "usc", "code")
+# Characters kept before and after a keyword hit, enough for the longest
+# "chapter N of title N, United States Code" prefix and section suffixes
+WINDOW_BEFORE = 80
+WINDOW_AFTER = 80
+
+if ahocorasick is not None:
+    _KEYWORD_AUTOMATON = ahocorasick.Automaton()
+    for keyword in CITATION_KEYWORDS:
+        _KEYWORD_AUTOMATON.add_word(keyword, keyword)
+    _KEYWORD_AUTOMATON.make_automaton()
+
+# Function to yield (start, end) offsets of every keyword occurrence in lowercased text
+def _keyword_hits(lowered):
+    if ahocorasick is not None:
+        for last, keyword in _KEYWORD_AUTOMATON.iter(lowered):
+            yield last + 1 - len(keyword), last + 1
+        return
+    for keyword in CITATION_KEYWORDS:
+        start = lowered.find(keyword)
+        while start != -1:
+            yield start, start + len(keyword)
+            start = lowered.find(keyword, start + 1)
+
+# Function to merge the text around keyword hits into non-overlapping windows
+def citation_windows(text):
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        # Lowercasing changed some offsets; scan the whole text instead
+        return [(0, len(text))]
+
+    windows = []
+    for hit_start, hit_end in sorted(_keyword_hits(lowered)):
+        start = max(0, hit_start - WINDOW_BEFORE)
+        end = min(len(text), hit_end + WINDOW_AFTER)
+        # Never cut through a token, so \b and the suffix class see the same text
+        while start > 0 and (text[start - 1].isalnum() or text[start - 1] == '_'):
+            start -= 1
+        while end < len(text) and (text[end].isalnum() or text[end] in '_-–'):
+            end += 1
+        if windows and start <= windows[-1][1]:
+            windows[-1] = (windows[-1][0], max(windows[-1][1], end))
+        else:
+            windows.append((start, end))
+    return windows
+
+# Function to scan text with Hyperscan; it reports every (start, end) a match can
+# take, so keep the leftmost-longest non-overlapping spans like re.findall does
+def _hyperscan_findall(text):
+    data = text.encode('utf-8', errors='replace')
+    spans = []
+
+    def on_match(match_id, start, end, flags, context):
+        spans.append((start, end))
+
+    _US_CODE_DB.scan(data, match_event_handler=on_match)
+
+    citations = []
+    pos = 0
+    for start, end in sorted(spans, key=lambda span: (span[0], -span[1])):
+        if start >= pos:
+            citations.append(data[start:end].decode('utf-8'))
+            pos = end
+    return citations
+
+# Characters that re's Unicode \s and \w treat differently from Hyperscan's and
+# RE2's: anything non-ASCII (no-break spaces, accented letters), plus the ASCII
+# vertical tab and \x1c-\x1f separators, which only re counts as whitespace
+_DFA_UNSAFE_RE = re.compile(r'[^\x00-\x7f]|[\v\x1c-\x1f]')
+
+# Function to run the citation pattern with the fastest available engine; text the
+# DFA engines would read differently goes to re
+def _findall(text):
+    if _DFA_UNSAFE_RE.search(text):
+        return _US_CODE_RE.findall(text)
+    if _US_CODE_DB is not None:
+        return _hyperscan_findall(text)
+    if _US_CODE_RE2 is not None:
+        return _US_CODE_RE2.findall(text)
+    return _US_CODE_RE.findall(text)
+
 # Function to find U.S. Code citations in text
 def find_us_code_citations(text):
-    pattern = (
-        r'\b(?:\d{1,2}\sU\.S\.C\.|\d{1,2}\sUSC|\d{1,2}\sU\.S\.\sCode|\d{1,2}\sU\.S\.\sC\.|\d{1,2}\sUS\sCode|chapter\s\d+\sof\stitle\s\d+,\sUnited\sStates\sCode|\d+\w+\sof\stitle\s\d+,\sUnited\sStates\sCode)\s?'
-        r'[\d\w\-\–]*\b'
-    )
-    citations = re.findall(pattern, text)
-    logging.info(f"Found {len(citations)} U.S. Code citations")
-    return citations
+    citations = []
+    for start, end in citation_windows(text):
+        citations.extend(_findall(text[start:end]))
+    # Keep each citation once, in order of first appearance
+    unique = list(dict.fromkeys(citations))
+    logging.info(f"Found {len(citations)} U.S. Code citations ({len(unique)} unique)")
+    return unique
 
-# URLs of the PDFs
-urls = [
-    "https://www.usda.gov/sites/default/files/documents/usda-dept-quick-start-guide-20180412.pdf",
-    "https://www.usda.gov/sites/default/files/documents/usda-departmental-directives-checklist.pdf",
-    "https://www.usda.gov/sites/default/files/documents/RD_WebsiteContentInventory2005_v02.pdf",
-    "https://www.usda.gov/sites/default/files/documents/ppd.pdf",
-    "https://www.usda.gov/sites/default/files/documents/GIPSA_WebsiteContentInventory2004_v01.pdf",
-    "https://www.usda.gov/sites/default/files/documents/directives-by-number-current-opi.pdf",
-    "https://www.rd.usda.gov/files/ilin1780guide11C.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/documents/FSISDirective4630.2Rev3Leave.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/documents/FSIS-Directive-4335.8.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/documents/FSIS_Directive_3410.3_Reimbursement_Allowance_Table.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/documents/7150.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/documents/67-23.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/documents/6100.3.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/documents/5000.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/documents/4610.2.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/documents/4451.5.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/documents/29-20.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/documents/13000.7.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/documents/13000.6.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/documents/1040.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/documents/10240.6.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2022-07/10800.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2022-05/12600.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2022-03/4300.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2022-03/13000.2.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2022-03/10800.3.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2022-03/10800.2.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2022-03/10240.3.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2022-02/10800.4.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2021-12/9910.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2021-11/34_IM_Non-Food-Safety-Consumer-Protection-Tasks-10222021.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2021-10/Tracked-changes-5000.1-Rev.6_0.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2021-10/9900.2.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2021-10/7520.2.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2021-10/6030.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2021-10/5030.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2021-10/5000.5.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2021-10/5000.4.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2021-10/3900.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2021-09/8010.3.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2021-09/7120.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2021-08/5100.4.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2021-08/4810.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2021-06/FSIS_Directive-7221.1-Rev_2_Prior_Labeling_Approval_0.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2021-06/6100.4.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2021-06/5620.1_0.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2021-06/23-21.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2021-05/8080.3_1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2021-05/5740.1_0.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2021-04/10800.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2021-03/7320.1_0.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2021-03/6900.2.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2021-03/4610.6.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2021-03/2680.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2021-03/10250.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2021-02/FSIS%20Directive%203800.2%20POV%20Reimbursement%20%28Reimbursement%20for%20Use%20of%20Privately%20Owned%20Vehicles%29.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2021-02/FSIS%20Directive%203800.1%20Temporary%20Duty%20Travel%20within%20Conus.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2021-02/9900.5.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2021-02/9900.3.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2021-02/9900.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2021-02/9510.1-tracked.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2021-02/9500.8.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2021-02/7235.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2021-02/5030.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2021-02/4630.5.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2021-02/10250.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2021-02/10230.3.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-08/PHVt-Processing_7000_Directive.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-08/4792.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-08/4791.6%20.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-08/4791.5.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-08/4791.13.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-08/4791.12.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-08/4791.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-08/4771.1%20.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-08/4735.9%20.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-08/4735.7.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-08/4735.4%20.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-08/4735.3.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-08/4630.7%20.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-08/4630.3.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-08/4610.9.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-08/4610.5%20.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-08/4610.1%20.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-08/4551.1%20.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-08/4550.7%20.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-08/4550.4%20.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-08/14000.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-08/12700.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-08/12600.2.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-08/12600.1.Amendment%202.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-08/10300.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-08/10240.5.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-08/10240.4.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-08/10100.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-08/10010.3.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-08/10010.2.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/9900.6.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/9900.4.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/9500.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/9040.5.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/9030.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/9010.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/9000.8.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/9000.2.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/9000.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/8410.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/8080.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/8010.4.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/8010.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/7700.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/7530.2.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/7530.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/7355.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/7320.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/7310.5.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/7230.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/7160.3.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/7150.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/7111.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/7010.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/7000.4.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/7000.2.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/6900.2.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/6810.2.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/6700.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/6600.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/6500.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/6420.5.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/6420.2.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/6410.4.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/6410.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/6400.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/6300.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/6240.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/6210.2.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/6120.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/6100.6.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/6100.2.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/6100.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/6090.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/6020.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/5930.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/5730.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/5710.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/5600.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/5500.4.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/5420.3.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/5220.3.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/5220.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/5110.3.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/5100.4.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/5100.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/5020.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/5010.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/5000.8.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/5000.7.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/5000.6.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/5000.5.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/5000.4.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/5000.2.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/5000.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/4530.3%20.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/4451.3%20.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/4430.5.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/4430.3%20.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/4410.1%20.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/4339.3%20.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/4338.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/4335.8%20.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/4335.1%20.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/4315.3%20.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/4315.2%20.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/4306.2%20.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/4300.10.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/4200.2.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/3830.2.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/3820.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/3810.3.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/3730.2.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/3700.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/3530.4.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/3410.3.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/2450.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/2410.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/1520.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/1310.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/1306.7.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/1306.22.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/1306.18.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/13000.3.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/13000.2.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/13000.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/1240.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/1230.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/1210.2.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/1090.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/1060.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/1010.2.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/media_file/2020-07/10010.1.pdf",
-    "https://www.fsis.usda.gov/sites/default/files/import/QA_6100.4.pdf",
-    "https://www.fsis.usda.gov/shared/training/5500.2.pdf",
-    "https://www.fs.usda.gov/t-d/pubs/ppt_html/htm05672C04/document/cpl2-103.pdf",
-    "https://www.fs.usda.gov/Internet/FSE_DOCUMENTS/stelprdb5394817.pdf",
-    "https://www.aphis.usda.gov/sites/default/files/mrp-5400-2.pdf",
-    "https://www.aphis.usda.gov/sites/default/files/mrp-5101-1.pdf",
-    "https://www.aphis.usda.gov/sites/default/files/mrp-4550-2.pdf",
-    "https://www.aphis.usda.gov/sites/default/files/mrp-4413-1.pdf",
-    "https://www.aphis.usda.gov/sites/default/files/mrp-3020-1.pdf",
-    "https://www.aphis.usda.gov/sites/default/files/hspd-9.pdf",
-    "https://www.aphis.usda.gov/sites/default/files/aphis-402-3.pdf",
-    "https://www.aphis.usda.gov/sites/default/files/aphis-3575-1.pdf",
-    "https://www.aphis.usda.gov/sites/default/files/aphis-3440-2.pdf",
-    "https://www.aphis.usda.gov/sites/default/files/aphis-3330-1.pdf",
-    "https://www.aphis.usda.gov/sites/default/files/aphis-3140-2.pdf",
-    "https://www.aphis.usda.gov/sites/default/files/aphis-2150-1.pdf",
-    "https://www.aphis.usda.gov/sites/default/files/aphis-1040-3.pdf",
-    "https://www.aphis.usda.gov/sites/default/files/4.115.pdf",
-    "https://www.aphis.usda.gov/sites/default/files/4.101.pdf",
-    "https://www.aphis.usda.gov/sites/default/files/3.115.pdf",
-    "https://www.aphis.usda.gov/sites/default/files/2.627.pdf",
-    "https://www.aphis.usda.gov/sites/default/files/2.510.pdf",
-    "https://www.aphis.usda.gov/sites/default/files/2.450.pdf",
-    "https://www.aphis.usda.gov/sites/default/files/2.430.pdf",
-    "https://www.aphis.usda.gov/sites/default/files/2.401.pdf",
-    "https://www.aphis.usda.gov/sites/default/files/2.215.pdf",
-    "https://www.aphis.usda.gov/sites/default/files/2.101.pdf",
-    "https://www.aphis.usda.gov/sites/default/files/1.210.pdf",
-    "https://www.aphis.usda.gov/sites/default/files/1.205.pdf",
-    "https://www.aphis.usda.gov/library/directives/pdf/APHIS_6901_1.pdf",
-    "https://www.ams.usda.gov/sites/default/files/media/MRP4531_1.pdf",
-    "https://www.ams.usda.gov/sites/default/files/media/Financial%20Guidelines%20For%20Cooperative%20Grading%20Programs.pdf",
-    "https://www.ams.usda.gov/sites/default/files/media/FGISDirective9180_74.pdf",
-    "https://www.ams.usda.gov/sites/default/files/media/FGIS9290_18.pdf",
-    "https://www.ams.usda.gov/sites/default/files/media/FGIS9180_78.pdf",
-    "https://www.ams.usda.gov/sites/default/files/media/FGIS9180_72.pdf",
-    "https://www.ams.usda.gov/sites/default/files/media/FGIS9180_67.pdf",
-    "https://www.ams.usda.gov/sites/default/files/media/FGIS9180_65.pdf",
-    "https://www.ams.usda.gov/sites/default/files/media/FGIS9180_61.pdf",
-    "https://www.ams.usda.gov/sites/default/files/media/FGIS9180_53.pdf",
-    "https://www.ams.usda.gov/sites/default/files/media/FGIS9180_49.pdf",
-    "https://www.ams.usda.gov/sites/default/files/media/FGIS9180_47.pdf",
-    "https://www.ams.usda.gov/sites/default/files/media/FGIS9180_40.pdf",
-    "https://www.ams.usda.gov/sites/default/files/media/FGIS9180_38.pdf",
-    "https://www.ams.usda.gov/sites/default/files/media/FGIS9180_35.pdf",
-    "https://www.ams.usda.gov/sites/default/files/media/FGIS9180_17.pdf",
-    "https://www.ams.usda.gov/sites/default/files/media/FGIS9170_13.pdf",
-    "https://www.ams.usda.gov/sites/default/files/media/FGIS9160_5.pdf",
-    "https://www.ams.usda.gov/sites/default/files/media/FGIS9160_3.pdf",
-    "https://www.ams.usda.gov/sites/default/files/media/FGIS9100_7.pdf",
-    "https://www.ams.usda.gov/sites/default/files/media/FGIS9070_6.pdf",
-    "https://www.ams.usda.gov/sites/default/files/media/FGIS9070_5.pdf",
-    "https://www.ams.usda.gov/sites/default/files/media/FGIS9060_2.pdf",
-    "https://www.ams.usda.gov/sites/default/files/media/FGIS4735_2.pdf",
-    "https://www.ams.usda.gov/sites/default/files/media/AMS%20Records%20Management%20Program.pdf",
-    "https://www.ams.usda.gov/sites/default/files/media/AMS%20Directive%203130.9.pdf",
-    "https://www.ams.usda.gov/sites/default/files/media/22203AMSDebtManagementDirective.pdf",
-    "https://directives.nrcs.usda.gov/sites/default/files2/1715860582/Part%20503%20Subpart%20A%20-%20General.pdf",
-]
-
-# Process each URL
-results = []
-for url in urls:
-    # Extract the filename from the URL
-    filename = url.split("/")[-1]
-    
-    # Download the PDF
-    if download_pdf(url, filename):
-        # Extract text from the PDF
-        text = extract_text_from_pdf(filename)
-        
-        # Find U.S. Code citations
-        citations = find_us_code_citations(text)
-        
-        # Store results
-        results.append({"filename": filename, "citations": citations})
-    
-    # Random delay between requests to mimic human behavior
-    time.sleep(random.uniform(2, 5))
-
-# Save results to a CSV file
-df = pd.DataFrame(results)
-df.to_csv("us_code_citations.csv", index=False)
-logging.info("Results saved to us_code_citations.csv")
+def main():
+    urls = load_urls(URLS_FILE)
+    taken = set()
+    filenames = [local_filename(url, taken) for url in urls]
+
+    # Save results to a Parquet file as they arrive; the writer is closed (and its
+    # footer written) even if the run fails, so finished row groups are kept
+    cache = load_citation_cache()
+    pending = []
+    with pq.ParquetWriter(OUTPUT_FILE, OUTPUT_SCHEMA, compression="zstd") as writer:
+        def flush_results():
+            if pending:
+                writer.write_table(pa.Table.from_pylist(pending, schema=OUTPUT_SCHEMA))
+                pending.clear()
+
+        def write_result(filename, citations):
+            pending.append({"filename": filename, "citations": citations})
+            if len(pending) >= ROW_GROUP_SIZE:
+                flush_results()
+
+        try:
+            # Download the PDFs and find U.S. Code citations, skipping extraction for unchanged files
+            with ProcessPoolExecutor(max_workers=os.cpu_count()) as pool:
+                asyncio.run(download_and_process_all(urls, filenames, pool, cache, write_result))
+        finally:
+            flush_results()
+    save_citation_cache(cache)
+    logging.info(f"Results saved to {OUTPUT_FILE}")
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,92 @@
 import os
-import time
+import json
+import hashlib
 import random
+import shutil
+import subprocess
+import threading
+import io
+import asyncio
 import logging
-import requests
-from requests.adapters import HTTPAdapter
-from requests.packages.urllib3.util.retry import Retry
-from fake_useragent import UserAgent
+import aiohttp
+import aiofiles
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 import re
-import pandas as pd
-import pdfplumber
+import csv
+from collections import defaultdict
+from urllib.parse import urlparse
+import fitz
+
+try:
+    import re2
+except ImportError:
+    re2 = None
 
 # Configure logging
 logging.basicConfig(
-    level=logging.DEBUG,
+    level=logging.INFO,
     format="%(asctime)s - %(levelname)s - %(message)s",
 )
+# Keep library chatter out of the progress log
+for noisy_logger in ("asyncio", "aiohttp"):
+    logging.getLogger(noisy_logger).setLevel(logging.WARNING)
+
+# Download concurrency and retry settings
+MAX_CONCURRENT_DOWNLOADS = 8
+RETRY_TOTAL = 5
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Minimum spacing between request starts to the same host, in seconds
+HOST_REQUEST_GAP = 0.25
+_host_next_request = defaultdict(float)
+
+# Per-URL record of download validators and file hash; the extracted rows of each
+# PDF live in a sidecar CSV next to it, so they are only read when reused. Bump
+# the version whenever extraction changes so stale rows are re-extracted. The
+# manifest is also tied to the scanning engine (see CITATION_ENGINE)
+MANIFEST_PATH = os.path.join("downloads", ".manifest.json")
+MANIFEST_VERSION = 7
+ROWS_SUFFIX = ".rows.csv"
+
+# Columns of the output CSV, and its write buffer size
+CSV_FIELDS = ["url", "page", "citation", "context"]
+CSV_BUFFER_SIZE = 1 << 20
+
+# Regexes compiled once at import. A citation is a 1-3 digit title at a word
+# boundary, "U.S.C." and a section, with at most three spaces around "U.S.C.".
+# It runs on linear-time RE2 when google-re2 is installed; otherwise re uses
+# possessive quantifiers so near misses fail without backtracking into the section,
+# and re.ASCII so \b and \d agree with RE2's ASCII-only classes
+_WS_RE = re.compile(r"\s+")
+_DASH_TRANS = str.maketrans({"\u2014": "-", "\u2013": "-"})
+if re2 is not None:
+    _USC_RE = re2.compile(r"\b\d{1,3}[ \t\xa0]{0,3}U\.S\.C\.[ \t\xa0]{0,3}\d+[-,0-9a-zA-Z]*")
+else:
+    _USC_RE = re.compile(r"\b\d{1,3}[ \t\xa0]{0,3}U\.S\.C\.[ \t\xa0]{0,3}\d++[-,0-9a-zA-Z]*+", re.ASCII)
+CITATION_ENGINE = "re2" if re2 is not None else "re"
+
+# Poppler's pdftotext is preferred for extraction when it is on PATH
+PDFTOTEXT = shutil.which("pdftotext")
+PDFTOTEXT_TIMEOUT = 120
+PDFTOTEXT_READ_SIZE = 65536
+
+# PDFs whose first pages yield less text than this are treated as scanned images
+MIN_PROBE_TEXT = 20
+
+# A few current desktop browser User-Agents, one picked at random per download
+_UAS = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.4 Safari/605.1.15",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:125.0) Gecko/20100101 Firefox/125.0",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+)
+
+# Headers sent with every request; the User-Agent is picked per download
+SESSION_HEADERS = {
+    "Accept-Language": "en-US,en;q=0.9",
+    "Referer": "https://www.google.com",
+}
 
 def generate_output_filename():
     """
@@ -26,19 +97,18 @@ def generate_output_filename():
 
 def normalize_text(text):
     """
-    Normalize text by replacing line breaks, tabs, multiple spaces, and em-dashes.
+    Normalize text by replacing line breaks, tabs, multiple spaces, and em/en-dashes.
     """
-    text = re.sub(r"\s+", " ", text)  # Replace all whitespace with a single space
-    text = text.replace("—", "-")    # Replace em-dashes with en-dashes
-    return text
+    # Map dashes to hyphens, then collapse all whitespace to a single space
+    return _WS_RE.sub(" ", text.translate(_DASH_TRANS))
 
 def find_us_code_citations(text):
     """
     Extract US Code citations from text, even if interrupted by formatting characters.
+    Yields each citation with its match object, so its position comes from the same pass.
     """
-    pattern = r"(?:\d+)\s*U\.S\.C\.\s*(?:\d+[-,0-9a-zA-Z]*)"
-    citations = re.findall(pattern, text)
-    return [citation.strip() for citation in citations]
+    for match in _USC_RE.finditer(text):
+        yield match.group(0).strip(), match
 
 def get_context(text, match, context_length=40):
     """
@@ -48,98 +118,360 @@ def get_context(text, match, context_length=40):
     end_idx = min(match.end() + context_length, len(text))
     return text[start_idx:end_idx].strip()
 
-def download_pdf(url, filename):
+def load_manifest():
+    """
+    Load the download manifest, or start a new one if it is missing or outdated.
+    """
+    try:
+        with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("version") != MANIFEST_VERSION or manifest.get("engine") != CITATION_ENGINE:
+        return {}
+    return manifest["urls"]
+
+def save_manifest(entries):
+    """
+    Write the download manifest.
+    """
+    os.makedirs(os.path.dirname(MANIFEST_PATH), exist_ok=True)
+    with open(MANIFEST_PATH, "w", encoding="utf-8") as f:
+        json.dump({"version": MANIFEST_VERSION, "engine": CITATION_ENGINE, "urls": entries}, f)
+
+def load_rows(filepath, url):
+    """
+    Read the rows extracted from a downloaded PDF back from its sidecar.
+    """
+    with open(filepath + ROWS_SUFFIX, "r", newline="", encoding="utf-8") as f:
+        return [{**row, "url": url} for row in csv.DictReader(f)]
+
+def save_rows(filepath, rows):
+    """
+    Write the rows extracted from a downloaded PDF to its sidecar.
+    """
+    part_filename = filepath + ROWS_SUFFIX + ".part"
+    with open(part_filename, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+    os.replace(part_filename, filepath + ROWS_SUFFIX)
+
+def file_sha256(filepath):
+    """
+    Hash a downloaded file.
+    """
+    with open(filepath, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+async def wait_for_host(url):
+    """
+    Space out requests to the same host by HOST_REQUEST_GAP.
+    """
+    host = urlparse(url).netloc
+    now = asyncio.get_running_loop().time()
+    start = max(now, _host_next_request[host])
+    _host_next_request[host] = start + HOST_REQUEST_GAP
+    if start > now:
+        await asyncio.sleep(start - now)
+
+async def download_pdf(session, sem, url, filename, entry=None):
     """
     Download a PDF file from a URL using human-like behavior.
+
+    If a manifest entry is given, the request is conditional on its ETag and
+    Last-Modified values. Returns None on failure, otherwise a dict with the
+    response validators and whether the server answered 304 Not Modified.
     """
-    session = requests.Session()
-    retry = Retry(
-        total=5,
-        backoff_factor=random.uniform(1, 3),
-        status_forcelist=[429, 500, 502, 503, 504],
-    )
-    adapter = HTTPAdapter(max_retries=retry)
-    session.mount("http://", adapter)
-    session.mount("https://", adapter)
-
-    ua = UserAgent()
-    headers = {
-        "User-Agent": ua.random,
-        "Accept-Language": "en-US,en;q=0.9",
-        "Accept-Encoding": "gzip, deflate, br",
-        "Referer": "https://www.google.com",
-        "Connection": "keep-alive",
-    }
-    session.headers.update(headers)
+    headers = {"User-Agent": random.choice(_UAS)}
+    if entry:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+    backoff_factor = random.uniform(1, 3)
+
+    async with sem:
+        try:
+            logging.info(f"Attempting to download: {url}")
+            for attempt in range(RETRY_TOTAL + 1):
+                await wait_for_host(url)
+                try:
+                    async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=60)) as response:
+                        if response.status == 304 and entry:
+                            logging.info(f"Not modified: {url}")
+                            return {**entry, "not_modified": True}
+                        if response.status in RETRY_STATUSES and attempt < RETRY_TOTAL:
+                            logging.warning(f"HTTP {response.status} for {url}, retrying")
+                            await asyncio.sleep(backoff_factor * (2 ** attempt))
+                            continue
+                        response.raise_for_status()
+
+                        # Stream to a .part file in 64 KB chunks and move it into place
+                        # once complete, so a failed transfer never leaves a truncated PDF
+                        part_filename = filename + ".part"
+                        async with aiofiles.open(part_filename, "wb") as f:
+                            async for chunk in response.content.iter_chunked(65536):
+                                await f.write(chunk)
+                        os.replace(part_filename, filename)
+                        validators = {
+                            "etag": response.headers.get("ETag"),
+                            "last_modified": response.headers.get("Last-Modified"),
+                        }
+                    break
+                except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError) as e:
+                    if attempt == RETRY_TOTAL:
+                        raise
+                    logging.warning(f"Error downloading {url}: {e}, retrying")
+                    await asyncio.sleep(backoff_factor * (2 ** attempt))
+            logging.info(f"Successfully downloaded: {url}")
+            return {**validators, "not_modified": False}
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logging.error(f"Error downloading {url}: {e}")
+            return None
 
+def local_filename(url, taken):
+    """
+    Pick a unique local filename for a URL. Downloads run concurrently, so a URL
+    whose basename is already taken gets its parent directory as a prefix.
+    """
+    filename = os.path.basename(url)
+    if filename in taken:
+        filename = f"{url.split('/')[-2]}_{filename}"
+    taken.add(filename)
+    return filename
+
+def probe_with_pdftotext(filepath):
+    """
+    Extract the text of the first two pages of a PDF file with the pdftotext CLI.
+    Returns None if pdftotext is missing or fails, e.g. on encrypted PDFs.
+    """
+    if PDFTOTEXT is None:
+        return None
     try:
-        logging.info(f"Attempting to download: {url}")
-        response = session.get(url, timeout=60)
-        response.raise_for_status()
+        result = subprocess.run(
+            [PDFTOTEXT, "-q", "-l", "2", filepath, "-"],
+            capture_output=True,
+            timeout=PDFTOTEXT_TIMEOUT,
+        )
+    except (OSError, subprocess.TimeoutExpired) as e:
+        logging.warning(f"pdftotext failed on {filepath}: {e}")
+        return None
+    if result.returncode != 0:
+        logging.warning(f"pdftotext exited with {result.returncode} on {filepath}, falling back to PyMuPDF")
+        return None
+    return result.stdout.decode("utf-8", errors="replace")
 
-        with open(filename, "wb") as f:
-            f.write(response.content)
-        logging.info(f"Successfully downloaded: {url}")
-        return True
-    except requests.exceptions.RequestException as e:
-        logging.error(f"Error downloading {url}: {e}")
-        return False
+def stream_pages_with_pdftotext(filepath):
+    """
+    Yield the text of each page of a PDF file as pdftotext writes it, so only
+    one page of text is held in memory. Raises CalledProcessError if pdftotext
+    is killed by the timeout or exits non-zero part way through.
+    """
+    with subprocess.Popen(
+        [PDFTOTEXT, "-q", filepath, "-"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    ) as proc:
+        timer = threading.Timer(PDFTOTEXT_TIMEOUT, proc.kill)
+        timer.start()
+        try:
+            reader = io.TextIOWrapper(proc.stdout, encoding="utf-8", errors="replace", newline="")
+            # pdftotext ends every page, including the last, with a form feed
+            parts = []
+            while chunk := reader.read(PDFTOTEXT_READ_SIZE):
+                *page_ends, rest = chunk.split("\f")
+                for page_end in page_ends:
+                    parts.append(page_end)
+                    yield "".join(parts)
+                    parts = []
+                parts.append(rest)
+            if any(parts):
+                yield "".join(parts)
+        finally:
+            timer.cancel()
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, proc.args)
 
-def extract_text_from_pdf(filepath):
+def pdftotext_pages(filepath):
     """
-    Extract text from a PDF file using pdfplumber.
+    Return the page numbers and texts of a PDF file from pdftotext, streamed page
+    by page, or None if pdftotext is missing or cannot read the file.
+    Scanned PDFs have no pages.
+    """
+    probe = probe_with_pdftotext(filepath)
+    if probe is None:
+        return None
+    if len(probe.strip()) < MIN_PROBE_TEXT:
+        logging.info(f"Skipped (scanned): {filepath}")
+        return []
+    return enumerate(stream_pages_with_pdftotext(filepath), start=1)
+
+def pymupdf_pages(filepath):
     """
+    Yield the page number and text of each page of a PDF file using PyMuPDF.
+    Scanned PDFs yield nothing.
+    """
+    # Open by path: MuPDF reads the file itself, so there is no Python-side read
+    # to avoid, and pdftotext needs a path anyway
+    with fitz.open(filepath) as doc:
+        # Scanned, image-only PDFs have no text layer; probe the first one or two
+        # pages rather than walking every page's graphics for nothing
+        first = doc[0].get_text("text") if doc.page_count else ""
+        probe = first
+        if len(probe.strip()) < MIN_PROBE_TEXT and doc.page_count > 1:
+            probe += doc[1].get_text("text")
+        if len(probe.strip()) < MIN_PROBE_TEXT:
+            logging.info(f"Skipped (scanned): {filepath}")
+            return
+        yield 1, first
+        # doc.pages(1) raises "bad start page number" on one-page documents
+        for page_index in range(1, doc.page_count):
+            yield page_index + 1, doc[page_index].get_text("text")
+
+def citation_rows(pages, url):
+    """
+    Yield a row for each US Code citation found in the given pages, with context.
+    """
+    for page_number, text in pages:
+        # Normalize text
+        text = normalize_text(text)
+
+        # Find US Code citations and their context in a single pass
+        for citation, match in find_us_code_citations(text):
+            context = get_context(text, match)
+            yield {
+                "url": url,
+                "page": page_number,
+                "citation": citation,
+                "context": context
+            }
+
+def process_one(filepath, url):
+    """
+    Extract the US Code citations and their context from one downloaded PDF.
+    Pages are scanned one at a time, so only one page of text is held in memory.
+    Runs in a worker process, so only the citation rows travel back, not the text.
+
+    Returns the rows and whether the whole document was read. If pdftotext fails
+    part way through, the document is read again with PyMuPDF. If that fails too,
+    the rows found before the error are returned as incomplete.
+    """
+    pages = pdftotext_pages(filepath)
+    if pages is not None:
+        rows = []
+        try:
+            for row in citation_rows(pages, url):
+                rows.append(row)
+            return rows, True
+        except subprocess.CalledProcessError as e:
+            logging.warning(f"pdftotext failed part way through {filepath}: {e}, retrying with PyMuPDF")
+
+    rows = []
     try:
-        with pdfplumber.open(filepath) as pdf:
-            return " ".join([page.extract_text() for page in pdf.pages if page.extract_text()])
+        for row in citation_rows(pymupdf_pages(filepath), url):
+            rows.append(row)
     except Exception as e:
         logging.error(f"Error extracting text from {filepath}: {e}")
-        return ""
+        return rows, False
+    return rows, True
+
+async def process_url(session, sem, pool, manifest, extractions, url, filepath):
+    """
+    Download one PDF and return the US Code citations found in it, with context.
+    Unchanged PDFs recorded in the manifest are neither downloaded nor re-extracted,
+    and a file already extracted this run under another URL is not extracted again.
+    """
+    # Download the PDF, revalidating the cached copy if there is one. Local names
+    # depend on the order of the URL list, so an entry only counts while it was
+    # recorded for this file
+    entry = manifest.get(url)
+    if not (entry and entry.get("filepath") == filepath and os.path.exists(filepath)):
+        entry = None
+    result = await download_pdf(session, sem, url, filepath, entry)
+    if result is None:
+        return []
+
+    sha256 = await asyncio.to_thread(file_sha256, filepath)
+    if result["not_modified"] and entry.get("sha256") != sha256:
+        # The local file is not the body these validators belong to; fetch it again
+        logging.info(f"Cached copy does not match the manifest, downloading again: {url}")
+        result = await download_pdf(session, sem, url, filepath)
+        if result is None:
+            return []
+        sha256 = await asyncio.to_thread(file_sha256, filepath)
+    elif result["not_modified"] and os.path.exists(filepath + ROWS_SUFFIX):
+        logging.info(f"Reusing previous citations for: {filepath}")
+        return await asyncio.to_thread(load_rows, filepath, url)
+
+    if sha256 in extractions:
+        logging.info(f"Identical to an already processed file: {filepath}")
+    else:
+        logging.info(f"Processing file: {filepath}")
+        # Parse in a worker process so CPU-bound extraction overlaps other downloads
+        loop = asyncio.get_running_loop()
+        extractions[sha256] = loop.run_in_executor(pool, process_one, filepath, url)
+    rows, complete = await extractions[sha256]
+    rows = [{**row, "url": url} for row in rows]
+    if not complete:
+        # Keep partial results out of the manifest so the next run extracts again
+        manifest.pop(url, None)
+        return rows
+    await asyncio.to_thread(save_rows, filepath, rows)
+    manifest[url] = {
+        "filepath": filepath,
+        "etag": result["etag"],
+        "last_modified": result["last_modified"],
+        "sha256": sha256,
+    }
+    return rows
 
-def process_urls(urls):
+async def process_urls(urls):
     """
     Process a list of URLs to extract US Code citations and their context.
     """
     output_filename = generate_output_filename()
-    results = []
-
-    for url in urls:
-        # Extract the filename from the URL
-        filename = os.path.basename(url)
-        filepath = os.path.join("downloads", filename)
-
-        # Ensure download directory exists
-        os.makedirs("downloads", exist_ok=True)
-
-        # Download the PDF
-        if download_pdf(url, filepath):
-            logging.info(f"Processing file: {filepath}")
-            text = extract_text_from_pdf(filepath)
-            if text:
-                # Normalize text
-                text = normalize_text(text)
-
-                # Find US Code citations
-                citations = find_us_code_citations(text)
-
-                # Process each citation
-                for citation in citations:
-                    match = re.search(re.escape(citation), text)
-                    if match:
-                        context = get_context(text, match)
-                        results.append({
-                            "url": url,
-                            "citation": citation,
-                            "context": context
-                        })
-
-        # Random delay between requests to mimic human behavior
-        time.sleep(random.uniform(2, 5))
-
-    # Save results to a CSV file
-    if results:
-        df = pd.DataFrame(results)
-        df.to_csv(output_filename, index=False)
+
+    # Drop repeated URLs, keeping the first occurrence of each
+    urls = list(dict.fromkeys(urls))
+
+    # Ensure download directory exists
+    os.makedirs("downloads", exist_ok=True)
+
+    # Extract the filename from each URL
+    taken = set()
+    filepaths = [os.path.join("downloads", local_filename(url, taken)) for url in urls]
+
+    sem = asyncio.Semaphore(MAX_CONCURRENT_DOWNLOADS)
+    connector = aiohttp.TCPConnector(limit=16, limit_per_host=4)
+
+    # Save results to a CSV file as each PDF finishes; the file is only
+    # created once the first citation arrives
+    manifest = load_manifest()
+    extractions = {}
+    out = None
+    try:
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as pool:
+            async with aiohttp.ClientSession(connector=connector, headers=SESSION_HEADERS) as session:
+                tasks = [
+                    process_url(session, sem, pool, manifest, extractions, url, filepath)
+                    for url, filepath in zip(urls, filepaths)
+                ]
+                for next_rows in asyncio.as_completed(tasks):
+                    rows = await next_rows
+                    if not rows:
+                        continue
+                    if out is None:
+                        out = open(output_filename, "w", buffering=CSV_BUFFER_SIZE, newline="", encoding="utf-8")
+                        writer = csv.DictWriter(out, fieldnames=CSV_FIELDS)
+                        writer.writeheader()
+                    writer.writerows(rows)
+    finally:
+        if out is not None:
+            out.close()
+        save_manifest(manifest)
+
+    if out is not None:
         logging.info(f"Results saved to {output_filename}")
     else:
         logging.warning("No citations found. No output file generated.")
@@ -442,5 +774,5 @@ if __name__ == "__main__":
     "https://www.ams.usda.gov/sites/default/files/media/22203AMSDebtManagementDirective.pdf",
     "https://directives.nrcs.usda.gov/sites/default/files2/1715860582/Part%20503%20Subpart%20A%20-%20General.pdf",
     ]
-    process_urls(url_list)
+    asyncio.run(process_urls(url_list))
 